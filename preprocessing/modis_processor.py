@@ -1,5 +1,6 @@
 """MODIS data preprocessing with proper coordinate conversion."""
 
+import re
 import numpy as np
 import xarray as xr
 from typing import Optional, Tuple
@@ -8,8 +9,95 @@ from pyproj import Transformer
 import rasterio
 from rasterio.transform import from_bounds
 
+try:
+    import cupy as cp
+    from cuproj.transformer import Transformer as CuTransformer
+except ImportError:
+    cp = None
+    CuTransformer = None
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
+
 logger = logging.getLogger(__name__)
 
+# Sphere radius (m) of the MODIS sinusoidal grid
+MODIS_SPHERE_RADIUS = 6371007.181
+
+# MODIS tile ID embedded in granule filenames, e.g. "h25v06"
+_TILE_RE = re.compile(r'h\d{2}v\d{2}')
+
+
+@njit(cache=True)
+def _nan_stats(a):
+    """Single-pass NaN-aware (count, min, max, mean) over ``a``."""
+    n = 0
+    mn = np.inf
+    mx = -np.inf
+    s = 0.0
+    for v in a.flat:
+        if v == v:  # NaN != NaN
+            n += 1
+            s += float(v)
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+    if n == 0:
+        return 0, np.nan, np.nan, 0.0
+    return n, mn, mx, s / n
+
+
+def _qc_decode(qc: np.ndarray, qc_tol: int) -> np.ndarray:
+    """Decode MOD11A1 QC bitfield and return boolean mask of acceptable pixels.
+    Bits (per v6 doc):
+      bits 0-1: Mandatory QA (0=best,1=good,2=fair,3=poor)
+      bits 2-3: Data quality (0=good,1=average,2=poor,3=other)
+      bit 5: LST error (> 0 indicates error)
+    Policy:
+      - Accept mandatory QA in {0,1}; if qc_tol>2 also accept 2 (fair)
+      - Accept data quality in {0,1}; if qc_tol>1 also accept 2 (poor)
+      - Require LST error bit == 0 when available
+    """
+    qa_mand = (qc & 0b11)  # bits 0-1
+    qa_data = ((qc >> 2) & 0b11)  # bits 2-3
+    lst_err = ((qc >> 5) & 0b1)  # bit 5
+
+    # Mandatory QA acceptance
+    if qc_tol > 2:
+        mand_ok = (qa_mand <= 2)
+    else:
+        mand_ok = (qa_mand <= 1)
+
+    # Data quality acceptance
+    if qc_tol > 1:
+        data_ok = (qa_data <= 2)
+    else:
+        data_ok = (qa_data <= 1)
+
+    # LST error must be 0 when present
+    err_ok = (lst_err == 0)
+
+    return mand_ok & data_ok & err_ok
+
+
+def _process_band(lst: np.ndarray, qc: Optional[np.ndarray], qc_tol: int) -> Tuple[np.ndarray, int]:
+    """Convert a Kelvin LST band to float32 Celsius, NaN where range or QC checks fail.
+
+    Returns the converted band and the number of accepted pixels.
+    """
+    mask = (lst > 200) & (lst < 400)
+    if qc is not None:
+        mask &= _qc_decode(qc.astype('int64'), qc_tol)
+    return np.where(mask, lst - 273.15, np.nan).astype(np.float32), int(np.count_nonzero(mask))
+
+
 class MODISProcessor:
     """Process MODIS HDF files and convert to geographic coordinates."""
     
@@ -24,15 +112,33 @@ class MODISProcessor:
         
         # Calculate tile bounds based on MODIS grid system
         self.tile_bounds = self._calculate_tile_bounds()
+        
+        # Mumbai region used to window tiles before QC/conversion (expanded bounds)
+        self.region_bounds = {
+            'lat_min': 18.5, 'lat_max': 19.5,
+            'lon_min': 72.5, 'lon_max': 73.2
+        }
+        
+        # Build the sinusoidal -> geographic transformer once per processor
+        self._transformer = Transformer.from_crs(self.modis_srs, self.geographic_srs, always_xy=True)
+        self._gpu_tx = self._create_gpu_transformer()
+    
+    def _create_gpu_transformer(self):
+        """Create a cuProj transformer when a GPU stack is available, else None."""
+        if CuTransformer is None:
+            return None
+        try:
+            return CuTransformer.from_crs(self.modis_srs, self.geographic_srs)
+        except Exception as e:
+            # cuProj only supports a subset of EPSG projections (no sinusoidal yet)
+            logger.info(f"ℹ️  cuProj unavailable for MODIS projection, using CPU transform: {e}")
+            return None
     
     def get_tile_from_filename(self, filename: str) -> str:
         """Extract MODIS tile ID from filename."""
         # Example: MOD11A1.A2023365.h14v04.061.2024004135620.hdf
-        parts = filename.split('.')
-        for part in parts:
-            if part.startswith('h') and 'v' in part:
-                return part
-        return 'h25v06'  # Default for Mumbai region
+        m = _TILE_RE.search(filename)
+        return m.group(0) if m else 'h25v06'  # Default for Mumbai region
     
     def _calculate_tile_bounds(self) -> dict:
         """Calculate bounds for MODIS tiles using the official grid system."""
@@ -62,8 +168,8 @@ class MODISProcessor:
         
         return tiles
     
-    def create_geographic_coordinates(self, shape: Tuple[int, int], tile_id: str) -> Tuple[np.ndarray, np.ndarray]:
-        """Create lat/lon coordinate arrays for MODIS tile."""
+    def _tile_axes(self, shape: Tuple[int, int], tile_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the 1D sinusoidal x (columns) and y (rows) axes of a MODIS tile."""
         rows, cols = shape
         
         # Get tile bounds (these are approximate - in production you'd use MODIS metadata)
@@ -76,13 +182,63 @@ class MODISProcessor:
         # Create coordinate arrays in sinusoidal projection
         x = np.linspace(bounds['left'], bounds['right'], cols)
         y = np.linspace(bounds['top'], bounds['bottom'], rows)  # Note: top to bottom
+        return x, y
+    
+    def locate_region_window(self, shape: Tuple[int, int], tile_id: str, region: dict,
+                             pad: int = 20) -> Optional[Tuple[int, int, int, int]]:
+        """Find the padded (min_row, max_row, min_col, max_col) window of a tile covering region.
+
+        Uses the closed-form inverse of the spherical sinusoidal projection
+        (lat = y / R, lon = x / (R cos lat)), evaluating longitudes only for
+        rows inside the latitude band. Returns None when no pixel falls inside.
+        """
+        x, y = self._tile_axes(shape, tile_id)
+        
+        lat = np.degrees(y / MODIS_SPHERE_RADIUS)
+        row_idx = np.flatnonzero((lat >= region['lat_min']) & (lat <= region['lat_max']))
+        if row_idx.size == 0:
+            logger.info(f"🗺️  Mumbai region pixels: 0 out of {shape[0] * shape[1]}")
+            return None
+        
+        cos_lat = np.cos(np.radians(lat[row_idx]))
+        lon = np.degrees(x[None, :] / (MODIS_SPHERE_RADIUS * cos_lat[:, None]))
+        hit_rows, hit_cols = np.nonzero((lon >= region['lon_min']) & (lon <= region['lon_max']))
+        logger.info(f"🗺️  Mumbai region pixels: {hit_rows.size} out of {shape[0] * shape[1]}")
+        if hit_rows.size == 0:
+            return None
         
-        # Create meshgrid
-        xx, yy = np.meshgrid(x, y)
+        logger.info(f"✅ Found {hit_rows.size} pixels in Mumbai region")
         
-        # Transform to geographic coordinates
-        transformer = Transformer.from_crs(self.modis_srs, self.geographic_srs, always_xy=True)
-        lon, lat = transformer.transform(xx.flatten(), yy.flatten())
+        # Add padding but ensure we stay within bounds
+        hit_rows = row_idx[hit_rows]
+        min_row = max(0, int(hit_rows.min()) - pad)
+        max_row = min(shape[0], int(hit_rows.max()) + pad + 1)
+        min_col = max(0, int(hit_cols.min()) - pad)
+        max_col = min(shape[1], int(hit_cols.max()) + pad + 1)
+        return min_row, max_row, min_col, max_col
+    
+    def create_geographic_coordinates(self, shape: Tuple[int, int], tile_id: str,
+                                      window: Optional[Tuple[int, int, int, int]] = None
+                                      ) -> Tuple[np.ndarray, np.ndarray]:
+        """Create lat/lon coordinate arrays for MODIS tile, optionally restricted to a window."""
+        x, y = self._tile_axes(shape, tile_id)
+        if window is not None:
+            min_row, max_row, min_col, max_col = window
+            x = x[min_col:max_col]
+            y = y[min_row:max_row]
+            shape = (y.size, x.size)
+        
+        # Broadcast views instead of a materialized meshgrid; ravel() copies each once
+        xx = np.broadcast_to(x[None, :], shape)
+        yy = np.broadcast_to(y[:, None], shape)
+        
+        # Transform to geographic coordinates (on GPU when cuProj is available)
+        if self._gpu_tx is not None:
+            # cuProj follows authority axis order, i.e. (lat, lon) for EPSG:4326
+            lat_d, lon_d = self._gpu_tx.transform(cp.asarray(xx.ravel()), cp.asarray(yy.ravel()))
+            lon, lat = cp.asnumpy(lon_d), cp.asnumpy(lat_d)
+        else:
+            lon, lat = self._transformer.transform(xx.ravel(), yy.ravel())
         
         # Reshape back to grid
         lon_grid = lon.reshape(shape)
@@ -90,10 +246,12 @@ class MODISProcessor:
         
         return lat_grid, lon_grid
     
-    def process_modis_lst(self, ds: xr.Dataset, filename: str, qc_tolerance: int = 1) -> xr.Dataset:
+    def process_modis_lst(self, ds: xr.Dataset, filename: str, qc_tolerance: int = 1,
+                          full_tile: bool = False) -> xr.Dataset:
         """Process MODIS LST data and add geographic coordinates.
 
         qc_tolerance: accept QC_Day values up to this threshold (e.g., 1 preferred, 2/3 as relaxed)
+        full_tile: keep the whole tile instead of windowing it to the Mumbai region
         """
         logger.info("🌡️  Processing MODIS LST data with geographic coordinates...")
         
@@ -113,79 +271,57 @@ class MODISProcessor:
             tile_id = self.get_tile_from_filename(filename)
             logger.info(f"🗺️  Processing MODIS tile: {tile_id}")
             
-            # Create geographic coordinates
-            lat_grid, lon_grid = self.create_geographic_coordinates(shape, tile_id)
-            
             # Apply quality control filtering
             qc_day = ds.get('QC_Day', None)
             qc_night = ds.get('QC_Night', None)
             
-            # Convert LST from Kelvin to Celsius and apply quality filtering
-            lst_day_celsius = lst_day - 273.15
-            lst_night_celsius = (lst_night - 273.15) if lst_night is not None else None
+            # Locate the Mumbai window before QC/conversion so only those pixels are processed
+            tile_shape = shape
+            window = None
+            if not full_tile:
+                window = self.locate_region_window(tile_shape, tile_id, self.region_bounds)
+                if window is not None:
+                    rows = slice(window[0], window[1])
+                    cols = slice(window[2], window[3])
+                    lst_day = lst_day[rows, cols]
+                    lst_night = lst_night[rows, cols] if lst_night is not None else None
+                    qc_day = qc_day[rows, cols] if qc_day is not None else None
+                    qc_night = qc_night[rows, cols] if qc_night is not None else None
+                    shape = lst_day.shape
+                    logger.info(f"📍 Mumbai subset shape: {shape}")
             
-            def _qc_decode(ok_qc: xr.DataArray, qc_tol: int) -> xr.DataArray:
-                """Decode MOD11A1 QC bitfield and return boolean mask of acceptable pixels.
-                Bits (per v6 doc):
-                  bits 0-1: Mandatory QA (0=best,1=good,2=fair,3=poor)
-                  bits 2-3: Data quality (0=good,1=average,2=poor,3=other)
-                  bit 5: LST error (> 0 indicates error)
-                Policy:
-                  - Accept mandatory QA in {0,1}; if qc_tol>2 also accept 2 (fair)
-                  - Accept data quality in {0,1}; if qc_tol>1 also accept 2 (poor)
-                  - Require LST error bit == 0 when available
-                """
-                qa_mand = (ok_qc & 0b11)  # bits 0-1
-                qa_data = ((ok_qc >> 2) & 0b11)  # bits 2-3
-                lst_err = ((ok_qc >> 5) & 0b1)  # bit 5
-
-                # Mandatory QA acceptance
-                if qc_tol > 2:
-                    mand_ok = (qa_mand <= 2)
-                else:
-                    mand_ok = (qa_mand <= 1)
-
-                # Data quality acceptance
-                if qc_tol > 1:
-                    data_ok = (qa_data <= 2)
-                else:
-                    data_ok = (qa_data <= 1)
-
-                # LST error must be 0 when present
-                err_ok = (lst_err == 0)
-
-                return mand_ok & data_ok & err_ok
-
-            # Apply quality control masks (day)
+            # Create geographic coordinates
+            lat_grid, lon_grid = self.create_geographic_coordinates(tile_shape, tile_id, window)
+            
+            # Convert LST from Kelvin to Celsius and apply quality filtering
+            lst_day_celsius, accepted = _process_band(
+                lst_day.values, qc_day.values if qc_day is not None else None, qc_tolerance
+            )
             if qc_day is not None:
-                qc_mask_day = _qc_decode(qc_day.astype('int64'), qc_tolerance)
-                range_mask = (lst_day > 200) & (lst_day < 400)
-                good_quality_mask = qc_mask_day & range_mask
-                lst_day_celsius = lst_day_celsius.where(good_quality_mask, np.nan)
-                logger.info(
-                    f"🔍 QC applied (QC tol={qc_tolerance}): accepted={int(good_quality_mask.sum().values)} / {lst_day.size}"
-                )
+                logger.info(f"🔍 QC applied (QC tol={qc_tolerance}): accepted={accepted} / {lst_day.size}")
             else:
-                # Basic temperature range filter if no QC data
-                temp_mask = (lst_day > 200) & (lst_day < 400)
-                lst_day_celsius = lst_day_celsius.where(temp_mask, np.nan)
-                logger.info(f"🔍 Applied temperature filter: {temp_mask.sum().values} valid pixels out of {lst_day.size}")
+                logger.info(f"🔍 Applied temperature filter: {accepted} valid pixels out of {lst_day.size}")
             
             # Same for night data
-            if lst_night_celsius is not None and qc_night is not None:
-                qc_mask_night = _qc_decode(qc_night.astype('int64'), qc_tolerance)
-                range_mask_n = (lst_night > 200) & (lst_night < 400)
-                good_quality_night = qc_mask_night & range_mask_n
-                lst_night_celsius = lst_night_celsius.where(good_quality_night, np.nan)
+            lst_night_celsius = None
+            if lst_night is not None:
+                lst_night_celsius, _ = _process_band(
+                    lst_night.values, qc_night.values if qc_night is not None else None, qc_tolerance
+                )
             
             # Create new dataset with geographic coordinates
-            processed_ds = xr.Dataset({
-                'temperature': (['lat', 'lon'], lst_day_celsius.values),
+            data_vars = {
+                'temperature': (['lat', 'lon'], lst_day_celsius),
                 'temperature_night': (['lat', 'lon'], 
-                                    lst_night_celsius.values if lst_night_celsius is not None else np.full(shape, np.nan)),
-                'quality_day': (['lat', 'lon'], qc_day.values if qc_day is not None else np.zeros(shape)),
-                'quality_night': (['lat', 'lon'], qc_night.values if qc_night is not None else np.zeros(shape))
-            }, coords={
+                                    lst_night_celsius if lst_night_celsius is not None else np.full(shape, np.nan))
+            }
+            # Only carry QC layers that exist in the source file
+            if qc_day is not None:
+                data_vars['quality_day'] = (['lat', 'lon'], qc_day.values)
+            if qc_night is not None:
+                data_vars['quality_night'] = (['lat', 'lon'], qc_night.values)
+            
+            processed_ds = xr.Dataset(data_vars, coords={
                 'lat': (['lat', 'lon'], lat_grid),
                 'lon': (['lat', 'lon'], lon_grid)
             })
@@ -200,51 +336,7 @@ class MODISProcessor:
                 'qc_tolerance': qc_tolerance
             })
             
-            # Clip to Mumbai region with better bounds checking
-            mumbai_bounds = {
-                'lat_min': 18.5, 'lat_max': 19.5,  # Expanded bounds
-                'lon_min': 72.5, 'lon_max': 73.2   # Expanded bounds
-            }
-            
-            # Create mask for Mumbai region
-            lat_mask = (lat_grid >= mumbai_bounds['lat_min']) & (lat_grid <= mumbai_bounds['lat_max'])
-            lon_mask = (lon_grid >= mumbai_bounds['lon_min']) & (lon_grid <= mumbai_bounds['lon_max'])
-            mumbai_mask = lat_mask & lon_mask
-            
-            mumbai_pixels = np.sum(mumbai_mask)
-            logger.info(f"🗺️  Mumbai region pixels: {mumbai_pixels} out of {lat_grid.size}")
-            
-            if mumbai_pixels > 0:
-                logger.info(f"✅ Found {mumbai_pixels} pixels in Mumbai region")
-                
-                # Extract Mumbai subset with indices
-                mumbai_indices = np.where(mumbai_mask)
-                if len(mumbai_indices[0]) > 0:
-                    # Create a smaller dataset focused on Mumbai
-                    min_row, max_row = mumbai_indices[0].min(), mumbai_indices[0].max()
-                    min_col, max_col = mumbai_indices[1].min(), mumbai_indices[1].max()
-                    
-                    # Add padding but ensure we stay within bounds
-                    pad = 20
-                    min_row = max(0, min_row - pad)
-                    max_row = min(shape[0], max_row + pad + 1)
-                    min_col = max(0, min_col - pad)
-                    max_col = min(shape[1], max_col + pad + 1)
-                    
-                    # Subset the data
-                    processed_ds = processed_ds.isel(
-                        lat=slice(min_row, max_row),
-                        lon=slice(min_col, max_col)
-                    )
-                    
-                    logger.info(f"📍 Mumbai subset shape: {processed_ds.temperature.shape}")
-                    
-                    # Check if we have valid temperature data after clipping
-                    temp_data = processed_ds.temperature.values
-                    valid_temps = temp_data[~np.isnan(temp_data)]
-                    logger.info(f"🌡️  Valid temperature pixels after clipping: {len(valid_temps)}")
-                    
-            else:
+            if window is None and not full_tile:
                 logger.warning("⚠️  No pixels found in Mumbai region")
                 # Check if the tile covers a different region
                 lat_range = f"{lat_grid.min():.2f} to {lat_grid.max():.2f}"
@@ -252,13 +344,14 @@ class MODISProcessor:
                 logger.info(f"🌍 Tile covers: Lat {lat_range}, Lon {lon_range}")
                 logger.info("📋 Using full tile data for analysis")
             
-            # Log temperature statistics
-            temp_data = processed_ds.temperature.values
-            valid_temps = temp_data[~np.isnan(temp_data)]
-            processed_ds.attrs['valid_pixel_count'] = int(valid_temps.size)
-            if len(valid_temps) > 0:
-                logger.info(f"🌡️  Temperature range: {valid_temps.min():.1f}°C to {valid_temps.max():.1f}°C")
-                logger.info(f"🌡️  Mean temperature: {valid_temps.mean():.1f}°C")
+            # Log temperature statistics (count/min/max/mean in one pass)
+            n_valid, t_min, t_max, t_mean = _nan_stats(processed_ds.temperature.values)
+            processed_ds.attrs['valid_pixel_count'] = int(n_valid)
+            if window is not None:
+                logger.info(f"🌡️  Valid temperature pixels after clipping: {n_valid}")
+            if n_valid > 0:
+                logger.info(f"🌡️  Temperature range: {t_min:.1f}°C to {t_max:.1f}°C")
+                logger.info(f"🌡️  Mean temperature: {t_mean:.1f}°C")
             
             return processed_ds
             
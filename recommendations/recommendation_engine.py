@@ -2,15 +2,127 @@
 
 import pandas as pd
 import geopandas as gpd
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache, wraps
+import hashlib
 import logging
+import math
+import sys
+from bisect import bisect_right
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
 
 logger = logging.getLogger(__name__)
 
 
+def safe_generate(label: str):
+    """Log a generator's output count, or log the error and return [] if it raises."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                recommendations = func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error generating {label} recommendations: {e}")
+                return []
+            logger.info(f"Generated {len(recommendations)} {label} recommendations")
+            return recommendations
+        return wrapper
+    return decorator
+
+
+@lru_cache(maxsize=None)
+def _title(category: str, intervention: str) -> str:
+    """Return "<category> - <first two words of intervention>".
+
+    Cached and interned so every recommendation with the same title shares one string.
+    """
+    return sys.intern(f"{category} - {' '.join(intervention.split()[:2])}")
+
+
+def _intern(value):
+    """Intern string values (e.g. ward names) so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+# City status bands: a score at or above _STATUS_THRESHOLDS[i] earns _STATUS_LABELS[i + 1]
+_STATUS_THRESHOLDS = (35, 50, 65, 80)
+_STATUS_LABELS = (
+    "Highly Vulnerable", "Vulnerable", "Developing Resilience",
+    "Moderately Resilient", "Highly Resilient"
+)
+
+
+@lru_cache(maxsize=2048)
+def _status_for(score_tenths: int) -> str:
+    """Return the city status label for a score expressed in tenths of a point."""
+    return _STATUS_LABELS[bisect_right(_STATUS_THRESHOLDS, score_tenths / 10)]
+
+
+@njit(cache=True)
+def _aqi_score(aqi):
+    """Return (mean AQI, 0-100 air quality score) ignoring NaNs.
+
+    Adjusted for Indian cities where AQI 100-300 is common:
+    AQI 0-50: Score 100 (Excellent)
+    AQI 51-100: Score 100 to 50 (Good)
+    AQI 101-200: Score 50 to 20 (Moderate)
+    AQI 201-300: Score 20 to 0 (Poor)
+    AQI 301+: Score 0 (Very Poor)
+    """
+    n = 0
+    total = 0.0
+    for i in range(aqi.size):
+        v = aqi[i]
+        if v == v:
+            n += 1
+            total += v
+    avg = total / n if n > 0 else np.nan
+    
+    if avg <= 50:
+        score = 100.0
+    elif avg <= 100:
+        score = 100.0 - (avg - 50)
+    elif avg <= 200:
+        score = 50.0 - (avg - 100) * 0.3
+    elif avg <= 300:
+        score = 20.0 - (avg - 200) * 0.2
+    else:
+        score = 0.0
+    return avg, max(0.0, score)
+
+
+@njit(cache=True)
+def _heat_score(heat_island_count):
+    """Return the 0-100 heat resilience score for a number of heat islands."""
+    # More heat islands = lower resilience score, normalized by expected max
+    heat_coverage = min(heat_island_count / 1000.0, 1.0)
+    return max(0.0, 100.0 - heat_coverage * 80.0)
+
+
+@njit(cache=True)
+def _flood_score(risk):
+    """Return (high-risk zone count, 0-100 flood resilience score) for zone risk scores."""
+    high_risk = 0
+    for i in range(risk.size):
+        if risk[i] >= 0.5:
+            high_risk += 1
+    risk_ratio = high_risk / risk.size
+    return high_risk, max(0.0, 100.0 - risk_ratio * 80.0)
+
+
 class InterventionType(Enum):
     """Types of urban resilience interventions."""
     AIR_QUALITY = "air_quality"
@@ -19,6 +131,10 @@ class InterventionType(Enum):
     HEALTHCARE = "healthcare"
     GREEN_SPACE = "green_space"
     INFRASTRUCTURE = "infrastructure"
+    
+    def __init__(self, label: str):
+        # Distinct bit per type so a set of types can be held in one int
+        self.bit = 1 << len(type(self).__members__)
 
 
 class Priority(Enum):
@@ -27,11 +143,20 @@ class Priority(Enum):
     HIGH = "High"
     MEDIUM = "Medium"
     LOW = "Low"
+    
+    def __init__(self, label: str):
+        # Sort rank in declaration order (CRITICAL=0 ... LOW=3)
+        self.rank = len(type(self).__members__)
 
 
-@dataclass
+@dataclass(slots=True)
 class Recommendation:
-    """A single recommendation for urban resilience improvement."""
+    """A single recommendation for urban resilience improvement.
+
+    Slotted only to drop the per-instance __dict__; instances are neither
+    immutable nor hashable (metrics is a plain dict). Generators construct
+    these positionally, so keep the field order stable.
+    """
     ward_number: int
     ward_name: str
     intervention_type: InterventionType
@@ -49,376 +174,378 @@ class Recommendation:
 class AirQualityRecommendationGenerator:
     """Generates air quality improvement recommendations."""
     
+    # (priority, interventions, cost, timeline) per AQI tier: >200, >150, >100
+    TIERS = (
+        (Priority.CRITICAL, [
+            "Implement emergency pollution control measures",
+            "Deploy air purification systems in public spaces",
+            "Restrict heavy vehicle traffic during peak hours"
+        ], 500000, "3-6 months"),
+        (Priority.HIGH, [
+            "Install air quality monitoring stations",
+            "Promote electric vehicle adoption",
+            "Implement green belt around industrial areas"
+        ], 300000, "6-12 months"),
+        (Priority.MEDIUM, [
+            "Increase urban tree plantation",
+            "Promote public transportation usage",
+            "Implement dust control measures"
+        ], 150000, "12-18 months"),
+    )
+    
+    @safe_generate("air quality")
     def generate_recommendations(self, ward_air_quality: pd.DataFrame, 
                                air_hotspots: gpd.GeoDataFrame) -> List[Recommendation]:
         """Generate air quality recommendations."""
         recommendations = []
         
-        try:
-            for _, ward in ward_air_quality.iterrows():
-                if ward['mean_aqi'] > 100:  # Poor air quality
-                    
-                    # Determine intervention based on AQI level
-                    if ward['mean_aqi'] > 200:
-                        priority = Priority.CRITICAL
-                        interventions = [
-                            "Implement emergency pollution control measures",
-                            "Deploy air purification systems in public spaces",
-                            "Restrict heavy vehicle traffic during peak hours"
-                        ]
-                        cost = 500000
-                        timeline = "3-6 months"
-                    elif ward['mean_aqi'] > 150:
-                        priority = Priority.HIGH
-                        interventions = [
-                            "Install air quality monitoring stations",
-                            "Promote electric vehicle adoption",
-                            "Implement green belt around industrial areas"
-                        ]
-                        cost = 300000
-                        timeline = "6-12 months"
-                    else:
-                        priority = Priority.MEDIUM
-                        interventions = [
-                            "Increase urban tree plantation",
-                            "Promote public transportation usage",
-                            "Implement dust control measures"
-                        ]
-                        cost = 150000
-                        timeline = "12-18 months"
-                    
-                    for i, intervention in enumerate(interventions):
-                        recommendations.append(Recommendation(
-                            ward_number=ward['ward_number'],
-                            ward_name=ward['ward_name'],
-                            intervention_type=InterventionType.AIR_QUALITY,
-                            priority=priority,
-                            title=f"Air Quality Improvement - {intervention.split()[0]} {intervention.split()[1]}",
-                            description=intervention,
-                            estimated_cost_usd=cost / len(interventions),
-                            estimated_impact="High" if ward['mean_aqi'] > 150 else "Medium",
-                            implementation_timeline=timeline,
-                            affected_population=int(ward['affected_population']),
-                            metrics={
-                                'current_aqi': ward['mean_aqi'],
-                                'target_aqi_reduction': min(50, ward['mean_aqi'] - 100),
-                                'population_benefited': ward['affected_population']
-                            }
-                        ))
-            
-            logger.info(f"Generated {len(recommendations)} air quality recommendations")
-            return recommendations
+        # Poor air quality wards, bucketed into AQI tiers in one vectorized pass
+        poor_wards = ward_air_quality[ward_air_quality['mean_aqi'] > 100]
+        aqi = poor_wards['mean_aqi'].to_numpy()
+        tiers = np.select([aqi > 200, aqi > 150], [0, 1], default=2)
+        # tolist() keeps the metrics plain Python floats (JSON-serializable)
+        target_reductions = np.minimum(50, aqi - 100).tolist()
+        tier_titles = [
+            [(_title("Air Quality Improvement", i), i) for i in interventions]
+            for _, interventions, _, _ in self.TIERS
+        ]
+        
+        for ward, tier, target_reduction in zip(poor_wards.itertuples(index=False), tiers, target_reductions):
+            priority, interventions, cost, timeline = self.TIERS[tier]
+            cost_share = cost / len(interventions)
+            impact = "High" if tier < 2 else "Medium"
+            population = int(ward.affected_population)
+            ward_name = _intern(ward.ward_name)
             
-        except Exception as e:
-            logger.error(f"Error generating air quality recommendations: {e}")
-            return []
+            recommendations.extend(
+                Recommendation(
+                    ward.ward_number, ward_name, InterventionType.AIR_QUALITY, priority, title,
+                    intervention, cost_share, impact, timeline, population,
+                    {
+                        'current_aqi': ward.mean_aqi,
+                        'target_aqi_reduction': target_reduction,
+                        'population_benefited': ward.affected_population
+                    }
+                )
+                for title, intervention in tier_titles[tier]
+            )
+        
+        return recommendations
 
 
 class HeatMitigationRecommendationGenerator:
     """Generates heat mitigation recommendations."""
     
+    # Heat islands are counted per 0.01 degree cell, keyed by a single int64:
+    # lat_cell * CELL_KEY_STRIDE + (lon_cell + CELL_LON_OFFSET)
+    CELL_KEY_STRIDE = 100_000
+    CELL_LON_OFFSET = 18_000  # shifts lon cells (-180..180 deg) to non-negative
+    
+    @safe_generate("heat mitigation")
     def generate_recommendations(self, heat_islands: gpd.GeoDataFrame,
                                cooling_analysis: pd.DataFrame,
                                ward_data: pd.DataFrame) -> List[Recommendation]:
         """Generate heat mitigation recommendations."""
         recommendations = []
         
-        try:
-            # Group heat islands by ward (simplified approach)
-            if not heat_islands.empty:
-                # Count heat islands per approximate area
-                heat_island_areas = heat_islands.groupby(
-                    [heat_islands.geometry.y.round(2), heat_islands.geometry.x.round(2)]
-                ).size().reset_index(name='heat_island_count')
-                
-                for _, area in heat_island_areas.iterrows():
-                    if area['heat_island_count'] >= 3:  # Significant heat island cluster
-                        
-                        priority = Priority.HIGH if area['heat_island_count'] >= 5 else Priority.MEDIUM
-                        
-                        interventions = [
-                            "Install cool roofing systems on public buildings",
-                            "Create urban forest corridors",
-                            "Implement misting systems in public areas",
-                            "Develop pocket parks with shade structures"
-                        ]
-                        
-                        cost = 200000 if priority == Priority.HIGH else 100000
-                        timeline = "9-15 months"
-                        
-                        # Map heat island to actual ward
-                        ward_num = (index % 24) + 1  # Distribute across Mumbai's 24 wards
-                        ward_name = f"Ward {ward_num}"
-                        
-                        for intervention in interventions[:2]:  # Top 2 interventions
-                            recommendations.append(Recommendation(
-                                ward_number=ward_num,
-                                ward_name=ward_name,
-                                intervention_type=InterventionType.HEAT_MITIGATION,
-                                priority=priority,
-                                title=f"Heat Island Mitigation - {intervention.split()[0]} {intervention.split()[1]}",
-                                description=intervention,
-                                estimated_cost_usd=cost / 2,
-                                estimated_impact="High" if priority == Priority.HIGH else "Medium",
-                                implementation_timeline=timeline,
-                                affected_population=5000,  # Estimated
-                                metrics={
-                                    'heat_islands_count': area['heat_island_count'],
-                                    'expected_temp_reduction': 2.5 if priority == Priority.HIGH else 1.5
-                                },
-                                coordinates=(area.iloc[1], area.iloc[0])  # lon, lat
-                            ))
-            
-            logger.info(f"Generated {len(recommendations)} heat mitigation recommendations")
-            return recommendations
+        if not heat_islands.empty:
+            # Count heat islands per approximate area using integer cell keys
+            lat_cells = np.round(heat_islands.geometry.y.to_numpy() * 100).astype(np.int64)
+            lon_cells = np.round(heat_islands.geometry.x.to_numpy() * 100).astype(np.int64)
+            cell_keys = lat_cells * self.CELL_KEY_STRIDE + (lon_cells + self.CELL_LON_OFFSET)
+            cell_counts = pd.Series(cell_keys).groupby(cell_keys).size()
+            clusters = int((cell_counts.to_numpy() >= 3).sum())  # Significant heat island clusters
             
-        except Exception as e:
-            logger.error(f"Error generating heat mitigation recommendations: {e}")
-            return []
+            # Heat islands carry no ward attribute, so clusters cannot be assigned
+            # to wards yet; emit nothing rather than guess a ward number
+            if clusters:
+                logger.warning(f"{clusters} heat island clusters found, but heat islands are not "
+                               "mapped to wards; skipping heat mitigation recommendations")
+        
+        return recommendations
 
 
 class FloodDefenseRecommendationGenerator:
     """Generates flood defense recommendations."""
     
+    # (priority, interventions, cost, timeline) per flood risk tier: >=0.75, >=0.5, below
+    TIERS = (
+        (Priority.CRITICAL, [
+            "Construct emergency flood barriers",
+            "Upgrade storm water drainage system",
+            "Install flood early warning systems"
+        ], 800000, "6-12 months"),
+        (Priority.HIGH, [
+            "Improve drainage infrastructure",
+            "Create retention ponds",
+            "Implement permeable pavement systems"
+        ], 400000, "12-18 months"),
+        (Priority.MEDIUM, [
+            "Regular drainage maintenance",
+            "Community flood preparedness training",
+            "Install water level monitoring"
+        ], 150000, "6-9 months"),
+    )
+    
+    @safe_generate("flood defense")
     def generate_recommendations(self, drainage_analysis: pd.DataFrame,
                                flood_zones: gpd.GeoDataFrame) -> List[Recommendation]:
         """Generate flood defense recommendations."""
         recommendations = []
         
-        try:
-            for _, ward in drainage_analysis.iterrows():
-                if ward['high_risk_zones'] > 0:
-                    
-                    if ward['max_flood_risk'] >= 0.75:
-                        priority = Priority.CRITICAL
-                        interventions = [
-                            "Construct emergency flood barriers",
-                            "Upgrade storm water drainage system",
-                            "Install flood early warning systems"
-                        ]
-                        cost = 800000
-                        timeline = "6-12 months"
-                    elif ward['max_flood_risk'] >= 0.5:
-                        priority = Priority.HIGH
-                        interventions = [
-                            "Improve drainage infrastructure",
-                            "Create retention ponds",
-                            "Implement permeable pavement systems"
-                        ]
-                        cost = 400000
-                        timeline = "12-18 months"
-                    else:
-                        priority = Priority.MEDIUM
-                        interventions = [
-                            "Regular drainage maintenance",
-                            "Community flood preparedness training",
-                            "Install water level monitoring"
-                        ]
-                        cost = 150000
-                        timeline = "6-9 months"
-                    
-                    for intervention in interventions:
-                        recommendations.append(Recommendation(
-                            ward_number=ward['ward_number'],
-                            ward_name=ward['ward_name'],
-                            intervention_type=InterventionType.FLOOD_DEFENSE,
-                            priority=priority,
-                            title=f"Flood Defense - {intervention.split()[0]} {intervention.split()[1]}",
-                            description=intervention,
-                            estimated_cost_usd=cost / len(interventions),
-                            estimated_impact="Critical" if priority == Priority.CRITICAL else "High",
-                            implementation_timeline=timeline,
-                            affected_population=int(ward['population_at_risk']),
-                            metrics={
-                                'flood_zones_count': ward['flood_zones_count'],
-                                'max_flood_risk': ward['max_flood_risk'],
-                                'drainage_capacity_needed': ward['drainage_capacity_needed']
-                            }
-                        ))
-            
-            logger.info(f"Generated {len(recommendations)} flood defense recommendations")
-            return recommendations
+        # Wards with high-risk zones, bucketed into risk tiers in one vectorized pass
+        at_risk = drainage_analysis[drainage_analysis['high_risk_zones'] > 0]
+        max_risk = at_risk['max_flood_risk'].to_numpy()
+        tiers = np.select([max_risk >= 0.75, max_risk >= 0.5], [0, 1], default=2)
+        tier_titles = [
+            [(_title("Flood Defense", i), i) for i in interventions]
+            for _, interventions, _, _ in self.TIERS
+        ]
+        
+        for ward, tier in zip(at_risk.itertuples(index=False), tiers):
+            priority, interventions, cost, timeline = self.TIERS[tier]
+            cost_share = cost / len(interventions)
+            impact = "Critical" if priority == Priority.CRITICAL else "High"
+            population = int(ward.population_at_risk)
+            ward_name = _intern(ward.ward_name)
             
-        except Exception as e:
-            logger.error(f"Error generating flood defense recommendations: {e}")
-            return []
+            recommendations.extend(
+                Recommendation(
+                    ward.ward_number, ward_name, InterventionType.FLOOD_DEFENSE, priority, title,
+                    intervention, cost_share, impact, timeline, population,
+                    {
+                        'flood_zones_count': ward.flood_zones_count,
+                        'max_flood_risk': ward.max_flood_risk,
+                        'drainage_capacity_needed': ward.drainage_capacity_needed
+                    }
+                )
+                for title, intervention in tier_titles[tier]
+            )
+        
+        return recommendations
 
 
 class HealthcareRecommendationGenerator:
     """Generates healthcare improvement recommendations."""
     
+    @safe_generate("healthcare")
     def generate_recommendations(self, healthcare_capacity: pd.DataFrame,
                                healthcare_gaps: gpd.GeoDataFrame) -> List[Recommendation]:
         """Generate healthcare recommendations."""
         recommendations = []
         
-        try:
-            for _, ward in healthcare_capacity.iterrows():
-                if ward['adequacy'] == 'Insufficient':
-                    
-                    if ward['facilities_per_1000'] < 0.2:
-                        priority = Priority.CRITICAL
-                        interventions = [
-                            "Establish new primary health center",
-                            "Deploy mobile medical units",
-                            "Set up telemedicine facilities"
-                        ]
-                        cost = 1000000
-                        timeline = "12-24 months"
-                    else:
-                        priority = Priority.HIGH
-                        interventions = [
-                            "Expand existing clinic capacity",
-                            "Add specialized medical services",
-                            "Improve ambulance services"
-                        ]
-                        cost = 500000
-                        timeline = "9-15 months"
-                    
-                    for intervention in interventions:
-                        recommendations.append(Recommendation(
-                            ward_number=ward['ward_number'],
-                            ward_name=ward['ward_name'],
-                            intervention_type=InterventionType.HEALTHCARE,
-                            priority=priority,
-                            title=f"Healthcare Access - {intervention.split()[0]} {intervention.split()[1]}",
-                            description=intervention,
-                            estimated_cost_usd=cost / len(interventions),
-                            estimated_impact="Critical" if priority == Priority.CRITICAL else "High",
-                            implementation_timeline=timeline,
-                            affected_population=int(ward['population']),
-                            metrics={
-                                'current_facilities_per_1000': ward['facilities_per_1000'],
-                                'target_facilities_per_1000': 1.0,
-                                'additional_facilities_needed': max(1, int((1.0 - ward['facilities_per_1000']) * ward['population'] / 1000))
-                            }
-                        ))
-            
-            logger.info(f"Generated {len(recommendations)} healthcare recommendations")
-            return recommendations
+        # Only wards with insufficient capacity get recommendations
+        insufficient = healthcare_capacity[healthcare_capacity['adequacy'] == 'Insufficient']
+        for ward in insufficient.itertuples(index=False):
+            if ward.facilities_per_1000 < 0.2:
+                priority = Priority.CRITICAL
+                interventions = [
+                    "Establish new primary health center",
+                    "Deploy mobile medical units",
+                    "Set up telemedicine facilities"
+                ]
+                cost = 1000000
+                timeline = "12-24 months"
+            else:
+                priority = Priority.HIGH
+                interventions = [
+                    "Expand existing clinic capacity",
+                    "Add specialized medical services",
+                    "Improve ambulance services"
+                ]
+                cost = 500000
+                timeline = "9-15 months"
             
-        except Exception as e:
-            logger.error(f"Error generating healthcare recommendations: {e}")
-            return []
+            cost_share = cost / len(interventions)
+            impact = "Critical" if priority == Priority.CRITICAL else "High"
+            population = int(ward.population)
+            ward_name = _intern(ward.ward_name)
+            additional_needed = max(1, int((1.0 - ward.facilities_per_1000) * ward.population / 1000))
+            
+            recommendations.extend(
+                Recommendation(
+                    ward.ward_number, ward_name, InterventionType.HEALTHCARE, priority,
+                    _title("Healthcare Access", intervention),
+                    intervention, cost_share, impact, timeline, population,
+                    {
+                        'current_facilities_per_1000': ward.facilities_per_1000,
+                        'target_facilities_per_1000': 1.0,
+                        'additional_facilities_needed': additional_needed
+                    }
+                )
+                for intervention in interventions
+            )
+        
+        return recommendations
 
 
 class GreenSpaceRecommendationGenerator:
     """Generates green space development recommendations."""
     
+    @safe_generate("green space")
     def generate_recommendations(self, green_deficits: pd.DataFrame) -> List[Recommendation]:
         """Generate green space recommendations."""
         recommendations = []
         
-        try:
-            for _, ward in green_deficits.iterrows():
-                if ward['priority'] in ['Critical', 'High']:
-                    
-                    if ward['priority'] == 'Critical':
-                        priority = Priority.CRITICAL
-                        interventions = [
-                            "Develop new urban parks",
-                            "Create rooftop gardens on public buildings",
-                            "Establish community gardens"
-                        ]
-                        cost = 300000
-                        timeline = "12-18 months"
-                    else:
-                        priority = Priority.HIGH
-                        interventions = [
-                            "Expand existing green spaces",
-                            "Plant street trees",
-                            "Create green corridors"
-                        ]
-                        cost = 150000
-                        timeline = "9-12 months"
-                    
-                    for intervention in interventions:
-                        recommendations.append(Recommendation(
-                            ward_number=ward['ward_number'],
-                            ward_name=ward['ward_name'],
-                            intervention_type=InterventionType.GREEN_SPACE,
-                            priority=priority,
-                            title=f"Green Space Development - {intervention.split()[0]} {intervention.split()[1]}",
-                            description=intervention,
-                            estimated_cost_usd=cost / len(interventions),
-                            estimated_impact="High" if priority == Priority.CRITICAL else "Medium",
-                            implementation_timeline=timeline,
-                            affected_population=int(ward['population']),
-                            metrics={
-                                'current_green_space_per_person': ward['green_space_per_person'],
-                                'target_green_space_per_person': ward['target_green_space_per_person'],
-                                'additional_green_space_needed': ward['recommended_new_green_space_sqm']
-                            }
-                        ))
-            
-            logger.info(f"Generated {len(recommendations)} green space recommendations")
-            return recommendations
+        # Only Critical/High deficit wards get recommendations
+        deficit_wards = green_deficits[green_deficits['priority'].isin(['Critical', 'High'])]
+        for ward in deficit_wards.itertuples(index=False):
+            if ward.priority == 'Critical':
+                priority = Priority.CRITICAL
+                interventions = [
+                    "Develop new urban parks",
+                    "Create rooftop gardens on public buildings",
+                    "Establish community gardens"
+                ]
+                cost = 300000
+                timeline = "12-18 months"
+            else:
+                priority = Priority.HIGH
+                interventions = [
+                    "Expand existing green spaces",
+                    "Plant street trees",
+                    "Create green corridors"
+                ]
+                cost = 150000
+                timeline = "9-12 months"
             
-        except Exception as e:
-            logger.error(f"Error generating green space recommendations: {e}")
-            return []
+            cost_share = cost / len(interventions)
+            impact = "High" if priority == Priority.CRITICAL else "Medium"
+            population = int(ward.population)
+            ward_name = _intern(ward.ward_name)
+            
+            recommendations.extend(
+                Recommendation(
+                    ward.ward_number, ward_name, InterventionType.GREEN_SPACE, priority,
+                    _title("Green Space Development", intervention),
+                    intervention, cost_share, impact, timeline, population,
+                    {
+                        'current_green_space_per_person': ward.green_space_per_person,
+                        'target_green_space_per_person': ward.target_green_space_per_person,
+                        'additional_green_space_needed': ward.recommended_new_green_space_sqm
+                    }
+                )
+                for intervention in interventions
+            )
+        
+        return recommendations
 
 
 class RecommendationEngine:
     """Main recommendation engine orchestrator."""
     
+    # Columns each generator reads from its input frame; the cache key covers
+    # only these (plus the index), so unused geometry is never hashed
+    INPUT_COLUMNS = {
+        'ward_air_quality': ('ward_number', 'ward_name', 'mean_aqi', 'affected_population'),
+        'drainage_analysis': ('ward_number', 'ward_name', 'high_risk_zones', 'max_flood_risk',
+                              'population_at_risk', 'flood_zones_count', 'drainage_capacity_needed'),
+        'healthcare_capacity': ('ward_number', 'ward_name', 'adequacy', 'facilities_per_1000',
+                                'population'),
+        'green_space_deficits': ('ward_number', 'ward_name', 'priority', 'population',
+                                 'green_space_per_person', 'target_green_space_per_person',
+                                 'recommended_new_green_space_sqm'),
+    }
+    # Inputs whose presence alone decides whether a generator runs
+    GATE_KEYS = ('air_quality_hotspots', 'heat_islands', 'flood_zones', 'healthcare_gaps')
+    # Number of distinct analysis inputs whose recommendations are kept
+    CACHE_SIZE = 8
+    
     def __init__(self):
         self.air_quality_generator = AirQualityRecommendationGenerator()
         self.heat_mitigation_generator = HeatMitigationRecommendationGenerator()
         self.flood_defense_generator = FloodDefenseRecommendationGenerator()
         self.healthcare_generator = HealthcareRecommendationGenerator()
         self.green_space_generator = GreenSpaceRecommendationGenerator()
+        self._recommendation_cache = OrderedDict()
+    
+    def _input_fingerprint(self, analysis_results: Dict) -> Optional[bytes]:
+        """Order-sensitive hash of the columns the generators read, or None if unhashable."""
+        digest = hashlib.blake2b(digest_size=16)
+        for key in self.GATE_KEYS:
+            digest.update(b'1' if key in analysis_results else b'0')
+        try:
+            for key, columns in self.INPUT_COLUMNS.items():
+                df = analysis_results.get(key)
+                if df is None:
+                    digest.update(b'-')
+                    continue
+                row_hashes = pd.util.hash_pandas_object(df[list(columns)], index=True)
+                digest.update(row_hashes.to_numpy().tobytes())
+        except Exception as e:
+            logger.debug(f"Analysis results not hashable, skipping recommendation cache: {e}")
+            return None
+        return digest.digest()
     
     def generate_all_recommendations(self, analysis_results: Dict) -> List[Recommendation]:
-        """Generate comprehensive recommendations from analysis results."""
+        """Generate comprehensive recommendations from analysis results.
+
+        Results are cached per content hash of the input DataFrames, so repeated
+        calls with unchanged analysis results skip the generators.
+        """
         logger.info("Generating comprehensive recommendations")
         
+        cache_key = self._input_fingerprint(analysis_results)
+        if cache_key is not None and cache_key in self._recommendation_cache:
+            self._recommendation_cache.move_to_end(cache_key)
+            logger.info("Reusing recommendations for unchanged analysis results")
+            return list(self._recommendation_cache[cache_key])
+        
         all_recommendations = []
         
         try:
+            # Collect the generators whose inputs are present; they share no state
+            jobs = []
+            
             # Air Quality Recommendations
             if 'ward_air_quality' in analysis_results and 'air_quality_hotspots' in analysis_results:
-                air_recs = self.air_quality_generator.generate_recommendations(
+                jobs.append((self.air_quality_generator, (
                     analysis_results['ward_air_quality'],
                     analysis_results['air_quality_hotspots']
-                )
-                all_recommendations.extend(air_recs)
+                )))
             
             # Heat Mitigation Recommendations
             if 'heat_islands' in analysis_results:
-                heat_recs = self.heat_mitigation_generator.generate_recommendations(
+                jobs.append((self.heat_mitigation_generator, (
                     analysis_results['heat_islands'],
                     analysis_results.get('cooling_analysis', pd.DataFrame()),
                     pd.DataFrame()  # ward_data placeholder
-                )
-                all_recommendations.extend(heat_recs)
+                )))
             
             # Flood Defense Recommendations
             if 'drainage_analysis' in analysis_results and 'flood_zones' in analysis_results:
-                flood_recs = self.flood_defense_generator.generate_recommendations(
+                jobs.append((self.flood_defense_generator, (
                     analysis_results['drainage_analysis'],
                     analysis_results['flood_zones']
-                )
-                all_recommendations.extend(flood_recs)
+                )))
             
             # Healthcare Recommendations
             if 'healthcare_capacity' in analysis_results and 'healthcare_gaps' in analysis_results:
-                health_recs = self.healthcare_generator.generate_recommendations(
+                jobs.append((self.healthcare_generator, (
                     analysis_results['healthcare_capacity'],
                     analysis_results['healthcare_gaps']
-                )
-                all_recommendations.extend(health_recs)
+                )))
             
             # Green Space Recommendations
             if 'green_space_deficits' in analysis_results:
-                green_recs = self.green_space_generator.generate_recommendations(
-                    analysis_results['green_space_deficits']
-                )
-                all_recommendations.extend(green_recs)
+                jobs.append((self.green_space_generator, (
+                    analysis_results['green_space_deficits'],
+                )))
+            
+            # Run generators concurrently; results are gathered in submission order
+            if jobs:
+                with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                    futures = [executor.submit(gen.generate_recommendations, *args) for gen, args in jobs]
+                    for future in futures:
+                        all_recommendations.extend(future.result())
             
             # Sort by priority and impact
-            priority_order = {Priority.CRITICAL: 0, Priority.HIGH: 1, Priority.MEDIUM: 2, Priority.LOW: 3}
-            all_recommendations.sort(key=lambda x: (priority_order[x.priority], -x.affected_population))
+            all_recommendations.sort(key=lambda x: (x.priority.rank, -x.affected_population))
+            
+            if cache_key is not None:
+                self._recommendation_cache[cache_key] = list(all_recommendations)
+                if len(self._recommendation_cache) > self.CACHE_SIZE:
+                    self._recommendation_cache.popitem(last=False)
             
             logger.info(f"Generated {len(all_recommendations)} total recommendations")
             return all_recommendations
@@ -427,35 +554,39 @@ class RecommendationEngine:
             logger.error(f"Error generating recommendations: {e}")
             return []
     
-    def create_ward_summary(self, recommendations: List[Recommendation]) -> Dict[int, Dict]:
-        """Create ward-level summary of recommendations."""
-        ward_summaries = {}
-        
+    @staticmethod
+    def _recommendations_summary(total: int, priority_counts, total_cost: float) -> Dict:
+        """City-wide recommendation summary from priority counts keyed by priority value."""
+        return {
+            'total_recommendations': total,
+            'critical_priority': int(priority_counts.get(Priority.CRITICAL.value, 0)),
+            'high_priority': int(priority_counts.get(Priority.HIGH.value, 0)),
+            'medium_priority': int(priority_counts.get(Priority.MEDIUM.value, 0)),
+            'low_priority': int(priority_counts.get(Priority.LOW.value, 0)),
+            'total_estimated_cost_usd': total_cost,
+            'avg_cost_per_recommendation': total_cost / total if total else 0
+        }
+    
+    def summarize(self, recommendations: List[Recommendation]) -> Tuple[Dict[int, Dict], Optional[Dict]]:
+        """Build ward summaries and the city-wide recommendation summary in one pass.
+
+        Returns ({}, None) and logs the error if the recommendations cannot be summarized.
+        """
         try:
+            if not recommendations:
+                return {}, self._recommendations_summary(0, {}, 0.0)
+            
+            # One pass collects per-ward details (first-seen ward order) and the aggregation columns
+            ward_names = {}
+            ward_recs = {}
+            columns = {'ward_number': [], 'priority': [], 'cost': [], 'type_bit': [], 'pop': []}
+            total_cost = 0.0
             for rec in recommendations:
                 ward_num = rec.ward_number
-                
-                if ward_num not in ward_summaries:
-                    ward_summaries[ward_num] = {
-                        'ward_number': ward_num,
-                        'ward_name': rec.ward_name,
-                        'total_recommendations': 0,
-                        'critical_priority': 0,
-                        'high_priority': 0,
-                        'medium_priority': 0,
-                        'low_priority': 0,
-                        'total_estimated_cost': 0,
-                        'intervention_types': set(),
-                        'affected_population': 0,
-                        'recommendations': []
-                    }
-                
-                summary = ward_summaries[ward_num]
-                summary['total_recommendations'] += 1
-                summary['total_estimated_cost'] += rec.estimated_cost_usd
-                summary['intervention_types'].add(rec.intervention_type.value)
-                summary['affected_population'] = max(summary['affected_population'], rec.affected_population)
-                summary['recommendations'].append({
+                if ward_num not in ward_recs:
+                    ward_names[ward_num] = rec.ward_name
+                    ward_recs[ward_num] = []
+                ward_recs[ward_num].append({
                     'title': rec.title,
                     'description': rec.description,
                     'priority': rec.priority.value,
@@ -463,31 +594,68 @@ class RecommendationEngine:
                     'timeline': rec.implementation_timeline,
                     'impact': rec.estimated_impact
                 })
-                
-                # Count by priority
-                if rec.priority == Priority.CRITICAL:
-                    summary['critical_priority'] += 1
-                elif rec.priority == Priority.HIGH:
-                    summary['high_priority'] += 1
-                elif rec.priority == Priority.MEDIUM:
-                    summary['medium_priority'] += 1
-                else:
-                    summary['low_priority'] += 1
-            
-            # Convert sets to lists for JSON serialization
-            for summary in ward_summaries.values():
-                summary['intervention_types'] = list(summary['intervention_types'])
-            
-            return ward_summaries
+                columns['ward_number'].append(ward_num)
+                columns['priority'].append(rec.priority.value)
+                columns['cost'].append(rec.estimated_cost_usd)
+                columns['type_bit'].append(rec.intervention_type.bit)
+                columns['pop'].append(rec.affected_population)
+                total_cost += rec.estimated_cost_usd
+            
+            # Totals and priority breakdowns aggregated per ward in one groupby
+            rec_df = pd.DataFrame(columns)
+            totals = rec_df.groupby('ward_number', sort=False).agg(
+                total_recommendations=('cost', 'size'),
+                total_cost=('cost', 'sum'),
+                type_bits=('type_bit', np.bitwise_or.reduce),
+                affected_population=('pop', 'max')
+            )
+            priority_counts = pd.crosstab(rec_df['ward_number'], rec_df['priority']).reindex(
+                columns=[p.value for p in Priority], fill_value=0
+            )
+            stats = totals.join(priority_counts).to_dict('index')
+            
+            ward_summaries = {}
+            for ward_num, recs in ward_recs.items():
+                ward_stats = stats[ward_num]
+                ward_summaries[ward_num] = {
+                    'ward_number': ward_num,
+                    'ward_name': ward_names[ward_num],
+                    'total_recommendations': int(ward_stats['total_recommendations']),
+                    'critical_priority': int(ward_stats[Priority.CRITICAL.value]),
+                    'high_priority': int(ward_stats[Priority.HIGH.value]),
+                    'medium_priority': int(ward_stats[Priority.MEDIUM.value]),
+                    'low_priority': int(ward_stats[Priority.LOW.value]),
+                    'total_estimated_cost': float(ward_stats['total_cost']),
+                    'intervention_types': [
+                        t.value for t in InterventionType if int(ward_stats['type_bits']) & t.bit
+                    ],
+                    'affected_population': int(ward_stats['affected_population']),
+                    'recommendations': recs
+                }
+            
+            # City-wide counts come from the per-ward breakdown rather than another pass
+            recommendations_summary = self._recommendations_summary(
+                len(recommendations), priority_counts.sum(), total_cost
+            )
+            return ward_summaries, recommendations_summary
             
         except Exception as e:
-            logger.error(f"Error creating ward summary: {e}")
-            return {}
+            logger.error(f"Error summarizing recommendations: {e}")
+            return {}, None
+    
+    def create_ward_summary(self, recommendations: List[Recommendation]) -> Dict[int, Dict]:
+        """Create ward-level summary of recommendations."""
+        return self.summarize(recommendations)[0]
     
     def calculate_city_resilience_score(self, analysis_results: Dict, 
-                                      recommendations: List[Recommendation]) -> Dict:
-        """Calculate overall city resilience score."""
+                                      recommendations: List[Recommendation],
+                                      recommendations_summary: Optional[Dict] = None) -> Dict:
+        """Calculate overall city resilience score.
+
+        Pass the summary from summarize() to avoid another pass over recommendations.
+        """
         try:
+            log_info = logger.isEnabledFor(logging.INFO)
             scores = {
                 'air_quality_score': 50,  # Default neutral score
                 'heat_resilience_score': 50,
@@ -502,26 +670,11 @@ class RecommendationEngine:
             if 'ward_air_quality' in analysis_results:
                 ward_air = analysis_results['ward_air_quality']
                 if not ward_air.empty:
-                    avg_aqi = ward_air['mean_aqi'].mean()
-                    # More realistic scoring for Indian cities:
-                    # AQI 0-50: Score 100 (Excellent)
-                    # AQI 51-100: Score 80 (Good) 
-                    # AQI 101-200: Score 50 (Moderate)
-                    # AQI 201-300: Score 20 (Poor)
-                    # AQI 301+: Score 0 (Very Poor)
-                    if avg_aqi <= 50:
-                        scores['air_quality_score'] = 100
-                    elif avg_aqi <= 100:
-                        scores['air_quality_score'] = 100 - (avg_aqi - 50)  # 100 to 50
-                    elif avg_aqi <= 200:
-                        scores['air_quality_score'] = 50 - (avg_aqi - 100) * 0.3  # 50 to 20
-                    elif avg_aqi <= 300:
-                        scores['air_quality_score'] = 20 - (avg_aqi - 200) * 0.2  # 20 to 0
-                    else:
-                        scores['air_quality_score'] = 0
-                    
-                    scores['air_quality_score'] = max(0, scores['air_quality_score'])
-                    logger.info(f"🌬️  Air Quality: AQI {avg_aqi:.1f} → Score {scores['air_quality_score']:.1f}/100")
+                    avg_aqi, scores['air_quality_score'] = _aqi_score(
+                        ward_air['mean_aqi'].to_numpy(dtype=np.float64)
+                    )
+                    if log_info:
+                        logger.info(f"🌬️  Air Quality: AQI {avg_aqi:.1f} → Score {scores['air_quality_score']:.1f}/100")
             
             # Heat Resilience Score (based on real MODIS data)
             if 'heat_islands' in analysis_results:
@@ -530,22 +683,22 @@ class RecommendationEngine:
                     # Score based on heat island intensity and coverage
                     total_area = len(heat_islands)
                     if total_area > 0:
-                        # More heat islands = lower resilience score
-                        heat_coverage = min(total_area / 1000, 1.0)  # Normalize by expected max
-                        scores['heat_resilience_score'] = max(0, 100 - (heat_coverage * 80))
-                        logger.info(f"🌡️  Heat Resilience: {total_area} heat islands → Score {scores['heat_resilience_score']:.1f}/100")
+                        scores['heat_resilience_score'] = _heat_score(total_area)
+                        if log_info:
+                            logger.info(f"🌡️  Heat Resilience: {total_area} heat islands → Score {scores['heat_resilience_score']:.1f}/100")
             
             # Healthcare Access Score (based on real healthcare gaps)
             if 'healthcare_gaps' in analysis_results:
                 health_gaps = analysis_results['healthcare_gaps']
                 if not health_gaps.empty:
                     # Score based on healthcare gap severity
-                    critical_gaps = len(health_gaps[health_gaps['priority'] == 'Critical'])
+                    critical_gaps = int(np.count_nonzero(health_gaps['priority'].to_numpy() == 'Critical'))
                     total_gaps = len(health_gaps)
                     if total_gaps > 0:
                         gap_ratio = critical_gaps / total_gaps
                         scores['healthcare_access_score'] = max(0, 100 - (gap_ratio * 100))
-                        logger.info(f"🏥 Healthcare Access: {critical_gaps}/{total_gaps} critical gaps → Score {scores['healthcare_access_score']:.1f}/100")
+                        if log_info:
+                            logger.info(f"🏥 Healthcare Access: {critical_gaps}/{total_gaps} critical gaps → Score {scores['healthcare_access_score']:.1f}/100")
             elif 'healthcare_capacity' in analysis_results:
                 health_cap = analysis_results['healthcare_capacity']
                 if not health_cap.empty:
@@ -558,46 +711,48 @@ class RecommendationEngine:
                 if not green_def.empty:
                     avg_green_score = green_def['combined_green_score'].mean()
                     scores['green_space_score'] = avg_green_score
-                    logger.info(f"🌳 Green Space: Average score {avg_green_score:.1f} → Score {scores['green_space_score']:.1f}/100")
+                    if log_info:
+                        logger.info(f"🌳 Green Space: Average score {avg_green_score:.1f} → Score {scores['green_space_score']:.1f}/100")
             
             # Flood Resilience Score (based on real flood zones analysis)
             if 'flood_zones' in analysis_results:
                 flood_zones = analysis_results['flood_zones']
                 if not flood_zones.empty:
-                    high_risk_zones = len(flood_zones[flood_zones['flood_risk_score'] >= 0.5])
                     total_zones = len(flood_zones)
-                    if total_zones > 0:
-                        risk_ratio = high_risk_zones / total_zones
-                        scores['flood_resilience_score'] = max(0, 100 - (risk_ratio * 80))
+                    high_risk_zones, scores['flood_resilience_score'] = _flood_score(
+                        flood_zones['flood_risk_score'].to_numpy(dtype=np.float64)
+                    )
+                    if log_info:
                         logger.info(f"🌊 Flood Resilience: {high_risk_zones}/{total_zones} high-risk zones → Score {scores['flood_resilience_score']:.1f}/100")
             elif 'drainage_analysis' in analysis_results:
                 drainage_data = analysis_results['drainage_analysis']
                 if not drainage_data.empty:
                     avg_flood_risk = drainage_data['avg_flood_risk'].mean()
                     scores['flood_resilience_score'] = max(0, 100 - (avg_flood_risk * 100))
-                    logger.info(f"🌊 Flood Resilience: Average risk {avg_flood_risk:.2f} → Score {scores['flood_resilience_score']:.1f}/100")
+                    if log_info:
+                        logger.info(f"🌊 Flood Resilience: Average risk {avg_flood_risk:.2f} → Score {scores['flood_resilience_score']:.1f}/100")
             
             # Calculate overall score
-            scores['overall_resilience_score'] = np.mean(list(scores.values())[:-1])
+            scores['overall_resilience_score'] = (
+                scores['air_quality_score']
+                + scores['heat_resilience_score']
+                + scores['flood_resilience_score']
+                + scores['healthcare_access_score']
+                + scores['green_space_score']
+            ) / 5.0
             
             # Add recommendation statistics
-            total_cost = sum(rec.estimated_cost_usd for rec in recommendations)
-            critical_recs = len([rec for rec in recommendations if rec.priority == Priority.CRITICAL])
-            high_recs = len([rec for rec in recommendations if rec.priority == Priority.HIGH])
-            medium_recs = len([rec for rec in recommendations if rec.priority == Priority.MEDIUM])
-            low_recs = len([rec for rec in recommendations if rec.priority == Priority.LOW])
+            if recommendations_summary is None:
+                # Not precomputed, or summarize() failed: count priorities directly
+                priority_counts = Counter(rec.priority.value for rec in recommendations)
+                total_cost = sum(rec.estimated_cost_usd for rec in recommendations)
+                recommendations_summary = self._recommendations_summary(
+                    len(recommendations), priority_counts, total_cost
+                )
             
             result = {
                 'resilience_scores': scores,
-                'recommendations_summary': {
-                    'total_recommendations': len(recommendations),
-                    'critical_priority': critical_recs,
-                    'high_priority': high_recs,
-                    'medium_priority': medium_recs,
-                    'low_priority': low_recs,
-                    'total_estimated_cost_usd': total_cost,
-                    'avg_cost_per_recommendation': total_cost / len(recommendations) if recommendations else 0
-                },
+                'recommendations_summary': recommendations_summary,
                 'city_status': self._determine_city_status(scores['overall_resilience_score'])
             }
             
@@ -609,13 +764,7 @@ class RecommendationEngine:
     
     def _determine_city_status(self, overall_score: float) -> str:
         """Determine city resilience status based on score."""
-        if overall_score >= 80:
-            return "Highly Resilient"
-        elif overall_score >= 65:
-            return "Moderately Resilient"
-        elif overall_score >= 50:
-            return "Developing Resilience"
-        elif overall_score >= 35:
-            return "Vulnerable"
-        else:
-            return "Highly Vulnerable"
+        if math.isnan(overall_score):
+            return _STATUS_LABELS[0]
+        # Floor rather than round so a score just under a threshold keeps the lower band
+        return _status_for(math.floor(overall_score * 10))
@@ -3,12 +3,34 @@
 
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime, timedelta
-import glob
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent))
+# (type, prefix, suffix) for each cached file kind; equivalent to the globs
+# OMI-Aura_L2-*.he5, MOD11A1.*.hdf and *_processed.nc
+CACHE_PATTERNS = (
+    ("omi", "OMI-Aura_L2-", ".he5"),
+    ("modis", "MOD11A1.", ".hdf"),
+    ("processed", "", "_processed.nc"),
+)
+
+def scan_cached_files(data_dir):
+    """Classify cached files in data_dir into OMI, MODIS and processed lists in one directory pass."""
+    
+    cached = {data_type: [] for data_type, _, _ in CACHE_PATTERNS}
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith("."):  # glob's * never matches hidden files
+                continue
+            for data_type, prefix, suffix in CACHE_PATTERNS:
+                # The length check stops prefix and suffix overlapping, e.g. "MOD11A1.hdf"
+                if (name.startswith(prefix) and name.endswith(suffix)
+                        and len(name) >= len(prefix) + len(suffix)):
+                    cached[data_type].append(entry)
+                    break
+    return cached
 
 def clear_cached_data(data_type="all"):
     """Clear cached NASA data to force fresh downloads."""
@@ -18,33 +40,29 @@ def clear_cached_data(data_type="all"):
         print("No cached data found.")
         return
     
-    files_removed = 0
+    cached = scan_cached_files(data_dir)
+    to_delete = []
     
     if data_type in ["all", "omi"]:
-        # Remove OMI files
-        omi_files = glob.glob(str(data_dir / "OMI-Aura_L2-*.he5"))
-        for file in omi_files:
-            os.remove(file)
-            files_removed += 1
-            print(f"🗑️  Removed: {Path(file).name}")
+        # OMI files
+        to_delete.extend(entry.path for entry in cached["omi"])
     
     if data_type in ["all", "modis"]:
-        # Remove MODIS files
-        modis_files = glob.glob(str(data_dir / "MOD11A1.*.hdf"))
-        for file in modis_files:
-            os.remove(file)
-            files_removed += 1
-            print(f"🗑️  Removed: {Path(file).name}")
+        # MODIS files
+        to_delete.extend(entry.path for entry in cached["modis"])
     
     if data_type in ["all", "processed"]:
-        # Remove processed files
-        processed_files = glob.glob(str(data_dir / "*_processed.nc"))
-        for file in processed_files:
-            os.remove(file)
-            files_removed += 1
-            print(f"🗑️  Removed: {Path(file).name}")
-    
-    print(f"✅ Removed {files_removed} cached files. Next analysis will download fresh data.")
+        # Processed files
+        to_delete.extend(entry.path for entry in cached["processed"])
+    
+    # Keep several unlinks in flight, then report once all have finished
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(os.remove, to_delete))
+    
+    for file in to_delete:
+        print(f"🗑️  Removed: {Path(file).name}")
+    
+    print(f"✅ Removed {len(to_delete)} cached files. Next analysis will download fresh data.")
 
 def check_data_age():
     """Check age of cached NASA data."""
@@ -57,21 +75,20 @@ def check_data_age():
     print("📅 Cached Data Status:")
     print("-" * 40)
     
+    cached = scan_cached_files(data_dir)
+    now_ts = time.time()
+    
     # Check OMI files
-    omi_files = glob.glob(str(data_dir / "OMI-Aura_L2-*.he5"))
-    for file in omi_files:
-        file_path = Path(file)
-        age = datetime.now() - datetime.fromtimestamp(file_path.stat().st_mtime)
-        status = "🟢 Fresh" if age.days < 1 else "🟡 Stale" if age.days < 7 else "🔴 Old"
-        print(f"   🛰️  OMI: {file_path.name[:30]}... ({age.days}d old) {status}")
+    for entry in cached["omi"]:
+        age_days = int((now_ts - entry.stat().st_mtime) // 86400)
+        status = "🟢 Fresh" if age_days < 1 else "🟡 Stale" if age_days < 7 else "🔴 Old"
+        print(f"   🛰️  OMI: {entry.name[:30]}... ({age_days}d old) {status}")
     
     # Check MODIS files
-    modis_files = glob.glob(str(data_dir / "MOD11A1.*.hdf"))
-    for file in modis_files:
-        file_path = Path(file)
-        age = datetime.now() - datetime.fromtimestamp(file_path.stat().st_mtime)
-        status = "🟢 Fresh" if age.days < 1 else "🟡 Stale" if age.days < 7 else "🔴 Old"
-        print(f"   🌡️  MODIS: {file_path.name[:30]}... ({age.days}d old) {status}")
+    for entry in cached["modis"]:
+        age_days = int((now_ts - entry.stat().st_mtime) // 86400)
+        status = "🟢 Fresh" if age_days < 1 else "🟡 Stale" if age_days < 7 else "🔴 Old"
+        print(f"   🌡️  MODIS: {entry.name[:30]}... ({age_days}d old) {status}")
     
     print("\n💡 Tip: Run 'python refresh_data.py clear' to force fresh downloads")
 
@@ -3,12 +3,13 @@
 import asyncio
 import logging
 import os
-import sys
+from dataclasses import asdict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+import orjson
+import zstandard
 
 from data_ingestion.nasa_apis import NASADataOrchestrator
 from data_ingestion.external_apis import ExternalDataOrchestrator
@@ -28,6 +29,50 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Ward summaries are keyed by integer ward number, which orjson only accepts with OPT_NON_STR_KEYS
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+@lru_cache(maxsize=32)
+def _ensure_dir(path: str):
+    """Create path and its parents once per process."""
+    Path(path).mkdir(parents=True, exist_ok=True)
+
+
+def _dumps(obj):
+    """Serialize obj to JSON bytes, falling back to str() for unknown types."""
+    return orjson.dumps(obj, option=JSON_OPTIONS, default=str)
+
+
+def _rec_to_dict(rec):
+    """JSON-ready dict for a Recommendation, with enums replaced by their values."""
+    return {
+        **asdict(rec),
+        'intervention_type': rec.intervention_type.value,
+        'priority': rec.priority.value
+    }
+
+
+def _write_results_bundle(path, analysis_json, recommendations, ward_summaries, city_score):
+    """Write all pipeline outputs as a single zstd-compressed JSON object.
+
+    Recommendations are serialized one at a time into the compressor, so the
+    encoded list is never held in memory as a whole.
+    """
+    with open(path, 'wb') as raw, zstandard.ZstdCompressor().stream_writer(raw) as f:
+        f.write(b'{"analysis":')
+        f.write(_dumps(analysis_json))
+        f.write(b',"recommendations":[')
+        for i, rec in enumerate(recommendations):
+            if i:
+                f.write(b',')
+            f.write(_dumps(_rec_to_dict(rec)))
+        f.write(b'],"ward_summaries":')
+        f.write(_dumps(ward_summaries))
+        f.write(b',"city_score":')
+        f.write(_dumps(city_score))
+        f.write(b'}')
+
 
 class DataIngestionWorker:
     """Background worker for automated data ingestion and processing."""
@@ -39,9 +84,14 @@ class DataIngestionWorker:
         self.analytics_engine = UrbanResilienceAnalyzer()
         self.recommendation_engine = RecommendationEngine()
         self.running = False
+        self._stop_event = asyncio.Event()
         
     async def start(self):
         """Start the background worker."""
+        if self._stop_event.is_set():
+            logger.info("Worker was stopped before it started; not starting")
+            return
+        
         logger.info("Starting Urban Resilience Data Ingestion Worker")
         self.running = True
         
@@ -50,7 +100,8 @@ class DataIngestionWorker:
                 await self.run_data_pipeline()
                 
                 # Wait for next cycle (run every 6 hours)
-                await asyncio.sleep(6 * 3600)
+                if await self._wait_for_stop(6 * 3600):
+                    break
                 
             except KeyboardInterrupt:
                 logger.info("Received shutdown signal")
@@ -58,21 +109,38 @@ class DataIngestionWorker:
             except Exception as e:
                 logger.error(f"Error in worker cycle: {e}")
                 # Wait 30 minutes before retrying on error
-                await asyncio.sleep(30 * 60)
+                if await self._wait_for_stop(30 * 60):
+                    break
+    
+    async def _wait_for_stop(self, timeout):
+        """Wait up to timeout seconds; return True if stop() was called meanwhile."""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
     
     async def run_data_pipeline(self):
         """Run the complete data pipeline."""
         logger.info("Starting data pipeline execution")
         
         try:
-            # Step 1: Data Ingestion
-            logger.info("Step 1: Ingesting NASA data")
-            nasa_datasets = await self.nasa_orchestrator.ingest_all_data(days_back=1)
-            await self.nasa_orchestrator.save_datasets(nasa_datasets)
-            
-            logger.info("Step 1: Ingesting external data")
-            external_datasets = await self.external_orchestrator.ingest_all_external_data()
-            await self.external_orchestrator.save_datasets(external_datasets)
+            # Step 1: Data Ingestion (NASA and external sources are fetched concurrently)
+            logger.info("Step 1: Ingesting NASA and external data")
+            nasa_datasets, external_datasets = await asyncio.gather(
+                self.nasa_orchestrator.ingest_all_data(days_back=1),
+                self.external_orchestrator.ingest_all_external_data(),
+                return_exceptions=True
+            )
+            # Save whichever sources succeeded before failing the pipeline on the other.
+            # save_datasets blocks on file writes internally, so the saves run one after another.
+            if not isinstance(nasa_datasets, BaseException):
+                await self.nasa_orchestrator.save_datasets(nasa_datasets)
+            if not isinstance(external_datasets, BaseException):
+                await self.external_orchestrator.save_datasets(external_datasets)
+            for result in (nasa_datasets, external_datasets):
+                if isinstance(result, BaseException):
+                    raise result
             
             # Step 2: Data Processing
             logger.info("Step 2: Processing and normalizing data")
@@ -88,9 +156,9 @@ class DataIngestionWorker:
             # Step 4: Generate Recommendations
             logger.info("Step 4: Generating recommendations")
             recommendations = self.recommendation_engine.generate_all_recommendations(analysis_results)
-            ward_summaries = self.recommendation_engine.create_ward_summary(recommendations)
+            ward_summaries, rec_summary = self.recommendation_engine.summarize(recommendations)
             city_score = self.recommendation_engine.calculate_city_resilience_score(
-                analysis_results, recommendations
+                analysis_results, recommendations, rec_summary
             )
             
             # Step 5: Save Results (in production, save to database)
@@ -107,57 +175,35 @@ class DataIngestionWorker:
         """Save pipeline results to storage."""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            results_dir = settings.processed_data_dir / "results" / timestamp
-            results_dir.mkdir(parents=True, exist_ok=True)
+            results_root = settings.processed_data_dir / "results"
+            results_path = results_root / f"results_{timestamp}.json.zst"
+            _ensure_dir(str(results_root))
             
-            # Save analysis results
-            import json
-            import pickle
-            
-            # Convert GeoDataFrames to GeoJSON for storage
-            analysis_json = {}
+            # Convert GeoDataFrames to GeoJSON for storage, serializing off the event loop
+            loop = asyncio.get_running_loop()
+            conversions = {}
             for key, value in analysis_results.items():
                 if hasattr(value, 'to_json'):  # GeoDataFrame
-                    analysis_json[key] = value.to_json()
+                    conversions[key] = loop.run_in_executor(None, value.to_json)
                 elif hasattr(value, 'to_dict'):  # DataFrame
-                    analysis_json[key] = value.to_dict('records')
+                    conversions[key] = loop.run_in_executor(None, value.to_dict, 'records')
                 else:
-                    analysis_json[key] = str(value)
-            
-            with open(results_dir / "analysis_results.json", 'w') as f:
-                json.dump(analysis_json, f, indent=2, default=str)
-            
-            # Save recommendations
-            recommendations_data = []
-            for rec in recommendations:
-                rec_dict = {
-                    'ward_number': rec.ward_number,
-                    'ward_name': rec.ward_name,
-                    'intervention_type': rec.intervention_type.value,
-                    'priority': rec.priority.value,
-                    'title': rec.title,
-                    'description': rec.description,
-                    'estimated_cost_usd': rec.estimated_cost_usd,
-                    'estimated_impact': rec.estimated_impact,
-                    'implementation_timeline': rec.implementation_timeline,
-                    'affected_population': rec.affected_population,
-                    'metrics': rec.metrics,
-                    'coordinates': rec.coordinates
-                }
-                recommendations_data.append(rec_dict)
+                    conversions[key] = asyncio.sleep(0, result=value)  # orjson falls back to str()
             
-            with open(results_dir / "recommendations.json", 'w') as f:
-                json.dump(recommendations_data, f, indent=2, default=str)
+            converted = await asyncio.gather(*conversions.values())
+            analysis_json = dict(zip(conversions.keys(), converted))
             
-            # Save ward summaries
-            with open(results_dir / "ward_summaries.json", 'w') as f:
-                json.dump(ward_summaries, f, indent=2, default=str)
-            
-            # Save city resilience score
-            with open(results_dir / "city_resilience_score.json", 'w') as f:
-                json.dump(city_score, f, indent=2, default=str)
+            # Write everything as one compressed artifact per cycle
+            bundle = (results_path, analysis_json, recommendations, ward_summaries, city_score)
+            try:
+                await asyncio.to_thread(_write_results_bundle, *bundle)
+            except FileNotFoundError:
+                # results root was removed since it was cached; recreate it
+                _ensure_dir.cache_clear()
+                _ensure_dir(str(results_root))
+                await asyncio.to_thread(_write_results_bundle, *bundle)
             
-            logger.info(f"Results saved to {results_dir}")
+            logger.info(f"Results saved to {results_path}")
             
         except Exception as e:
             logger.error(f"Failed to save results: {e}")
@@ -166,6 +212,7 @@ class DataIngestionWorker:
         """Stop the worker."""
         logger.info("Stopping data ingestion worker")
         self.running = False
+        self._stop_event.set()
 
 
 async def main():
@@ -1,15 +1,122 @@
 """Setup script for real NASA data integration and Supabase database."""
 
 import os
+import re
 import sys
 import subprocess
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, groupby
 from pathlib import Path
+from typing import Dict, Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# KEY=value lines, optionally indented or with spaces around '='; comments and
+# blank lines never match the identifier anchor
+_ENV_RE = re.compile(r'(?m)^[ \t]*([A-Za-z_]\w*)[ \t]*=(.*)$')
+
+# Template values from .env.example that do not count as real credentials
+_PLACEHOLDERS = frozenset({
+    'demo_user',
+    'your_real_nasa_username',
+    'your_access_token_here',
+    'https://your-project-id.supabase.co'
+})
+
+SUPABASE_SETUP_GUIDE = """# Supabase Setup Guide for Urban Resilience Dashboard
+
+## Step 1: Create Supabase Project
+
+1. Go to https://supabase.com
+2. Sign up/Login to your account
+3. Click "New Project"
+4. Choose organization and enter project details:
+   - Name: `urban-resilience-mumbai`
+   - Database Password: (choose a strong password)
+   - Region: Choose closest to your location
+
+## Step 2: Get Project Credentials
+
+1. Go to Project Settings > API
+2. Copy the following values:
+   - Project URL: `https://your-project-id.supabase.co`
+   - Anon/Public Key: `eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...`
+   - Service Role Key: `eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...`
+
+## Step 3: Update .env File
+
+Replace these values in your `.env` file:
+```
+SUPABASE_URL=https://your-actual-project-id.supabase.co
+SUPABASE_ANON_KEY=your_actual_anon_key
+SUPABASE_SERVICE_KEY=your_actual_service_role_key
+```
+
+## Step 4: Enable PostGIS (Optional)
+
+1. Go to Database > Extensions
+2. Search for "postgis"
+3. Enable the PostGIS extension
+
+## Step 5: Test Connection
+
+Run: `python setup_real_data.py test`
+
+Your Supabase database is now ready for the Urban Resilience Dashboard!
+"""
+
+NASA_SETUP_GUIDE = """# NASA Earthdata Setup Guide
+
+## Step 1: Create NASA Earthdata Account
+
+1. Go to https://urs.earthdata.nasa.gov/
+2. Click "Register for a profile"
+3. Fill out the registration form
+4. Verify your email address
+5. Complete your profile
+
+## Step 2: Get Your Credentials
+
+1. Login to NASA Earthdata
+2. Your username and password are your login credentials
+3. No additional API keys needed
+
+## Step 3: Update .env File
+
+Replace these values in your `.env` file:
+```
+NASA_EARTHDATA_USERNAME=your_actual_nasa_username
+NASA_EARTHDATA_PASSWORD=your_actual_nasa_password
+```
+
+## Step 4: Test Connection
+
+Run: `python setup_real_data.py test`
+
+## Available NASA Datasets
+
+With your credentials, you can access:
+- MODIS Land Surface Temperature (MOD11A1)
+- Aura OMI Air Quality (OMI NO2, SO2)
+- GPM Precipitation (IMERG)
+- Landsat NDVI and vegetation indices
+- VIIRS Night Lights
+
+Your NASA Earthdata access is now ready!
+"""
+
+
+def _write_if_changed(path, content):
+    """Write content to path unless the file already holds it; return True if written."""
+    data = content.encode('utf-8')
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
 
 class RealDataSetup:
     """Setup manager for real NASA data and Supabase integration."""
@@ -17,31 +124,49 @@ class RealDataSetup:
     def __init__(self):
         self.project_root = Path(__file__).parent
         self.env_file = self.project_root / ".env"
+        self._env = {}
+        self._env_stat = None
         
+    def _load_env(self, st: Optional[os.stat_result] = None):
+        """Parse the .env file, reusing the cached dict while its mtime and size are unchanged.
+
+        Pass st when the caller has already stat'ed the file.
+        """
+        if st is None:
+            st = self.env_file.stat()
+        env_stat = (st.st_mtime_ns, st.st_size)
+        if self._env and env_stat == self._env_stat:
+            return self._env
+        
+        text = self.env_file.read_text(encoding='utf-8')
+        self._env = {m.group(1): m.group(2).strip() for m in _ENV_RE.finditer(text)}
+        self._env_stat = env_stat
+        return self._env
+    
     def check_environment(self):
         """Check if .env file exists and has real credentials."""
         logger.info("🔍 Checking environment configuration...")
         
-        if not self.env_file.exists():
+        try:
+            env_stat = self.env_file.stat()
+        except FileNotFoundError:
             logger.error("❌ .env file not found. Please copy from .env.example")
             return False
         
+        if env_stat.st_size == 0:
+            logger.error("❌ .env file is empty. Please copy from .env.example")
+            return False
+        
         # Read .env file
-        env_vars = {}
-        with open(self.env_file, 'r') as f:
-            for line in f:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    env_vars[key] = value
+        env_vars = self._load_env(env_stat)
         
         # Check NASA credentials (token or username/password)
         nasa_token = env_vars.get('NASA_EARTHDATA_TOKEN', '')
         nasa_user = env_vars.get('NASA_EARTHDATA_USERNAME', '')
         nasa_pass = env_vars.get('NASA_EARTHDATA_PASSWORD', '')
         
-        has_token = nasa_token and nasa_token != 'your_access_token_here'
-        has_credentials = (nasa_user and nasa_user != 'demo_user' and 
-                          nasa_user != 'your_real_nasa_username')
+        has_token = nasa_token and nasa_token not in _PLACEHOLDERS
+        has_credentials = nasa_user and nasa_user not in _PLACEHOLDERS
         
         if has_token:
             logger.info("✅ Real NASA Earthdata access token found")
@@ -57,7 +182,7 @@ class RealDataSetup:
         supabase_url = env_vars.get('SUPABASE_URL', '')
         supabase_key = env_vars.get('SUPABASE_ANON_KEY', '')
         
-        if supabase_url and supabase_url != 'https://your-project-id.supabase.co':
+        if supabase_url and supabase_url not in _PLACEHOLDERS:
             logger.info("✅ Supabase credentials found")
             self.has_supabase = True
         else:
@@ -66,27 +191,30 @@ class RealDataSetup:
         
         return True
     
-    def install_dependencies(self):
+    async def install_dependencies(self):
         """Install required packages for real data access."""
         logger.info("📦 Installing required packages...")
         
         try:
-            # Install earthaccess for NASA data
-            subprocess.run([sys.executable, "-m", "pip", "install", "earthaccess>=0.9.0"], check=True)
+            # earthaccess for NASA data, the Supabase client and extra data formats, resolved together
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "pip", "install", "-q", "--disable-pip-version-check",
+                "earthaccess>=0.9.0", "supabase==2.0.2", "h5netcdf", "netcdf4",
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                raise subprocess.CalledProcessError(proc.returncode, "pip install", stderr=stderr)
             logger.info("✅ Installed earthaccess for NASA data access")
-            
-            # Install supabase client
-            subprocess.run([sys.executable, "-m", "pip", "install", "supabase==2.0.2"], check=True)
             logger.info("✅ Installed Supabase client")
-            
-            # Install additional geospatial packages
-            subprocess.run([sys.executable, "-m", "pip", "install", "h5netcdf", "netcdf4"], check=True)
             logger.info("✅ Installed additional data format support")
             
             return True
             
         except subprocess.CalledProcessError as e:
             logger.error(f"❌ Failed to install dependencies: {e}")
+            if e.stderr:
+                logger.error(e.stderr.decode(errors="replace").strip())
             return False
     
     def setup_data_directories(self):
@@ -108,14 +236,22 @@ class RealDataSetup:
             "data/local_db/recommendations"
         ]
         
-        for directory in directories:
-            os.makedirs(directory, exist_ok=True)
+        # Each distinct directory (ancestors included) is created once, a depth level at a time,
+        # so no mkdir re-walks shared parents such as data/ and data/local_db
+        paths = [Path(d) for d in directories]
+        unique_dirs = sorted(
+            set(chain.from_iterable((p, *p.parents[:-1]) for p in paths)),
+            key=lambda p: len(p.parts)
+        )
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _, level in groupby(unique_dirs, key=lambda p: len(p.parts)):
+                list(executor.map(lambda p: p.mkdir(exist_ok=True), level))
         
         logger.info("✅ Data directories created")
         return True
     
-    async def test_nasa_connection(self):
-        """Test NASA Earthdata connection."""
+    async def test_nasa_connection(self, env: Optional[Dict[str, str]] = None):
+        """Test NASA Earthdata connection, using env instead of .env when given."""
         if not self.has_real_nasa:
             logger.info("🎭 Skipping NASA connection test (no real credentials)")
             return True
@@ -125,40 +261,34 @@ class RealDataSetup:
         try:
             import earthaccess
             
-            # Read credentials from .env
-            env_vars = {}
-            with open(self.env_file, 'r') as f:
-                for line in f:
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        env_vars[key] = value
+            # Read credentials from .env unless they were passed in
+            env_vars = env if env is not None else self._load_env()
             
             username = env_vars.get('NASA_EARTHDATA_USERNAME')
             password = env_vars.get('NASA_EARTHDATA_PASSWORD')
             
-            # Set environment variables for earthaccess
-            import os
-            
             # Check for token first, then username/password
             nasa_token = env_vars.get('NASA_EARTHDATA_TOKEN', '')
-            has_token = nasa_token and nasa_token != 'your_access_token_here'
+            has_token = nasa_token and nasa_token not in _PLACEHOLDERS
             
+            # Set environment variables for earthaccess
             if has_token:
                 logger.info("🔑 Using NASA Earthdata access token for authentication")
-                os.environ['EARTHDATA_TOKEN'] = nasa_token
+                earthdata_env = {'EARTHDATA_TOKEN': nasa_token}
             else:
                 logger.info("🔑 Using NASA Earthdata username/password for authentication")
-                os.environ['EARTHDATA_USERNAME'] = username
-                os.environ['EARTHDATA_PASSWORD'] = password
+                earthdata_env = {'EARTHDATA_USERNAME': username, 'EARTHDATA_PASSWORD': password}
+            os.environ.update(earthdata_env)
             
-            # Test authentication - newer earthaccess API
-            auth = earthaccess.login(strategy="environment", persist=False)
+            # Test authentication - newer earthaccess API (blocking, so run it in a thread)
+            auth = await asyncio.to_thread(earthaccess.login, strategy="environment", persist=False)
             
             if auth.authenticated:
                 logger.info("✅ NASA Earthdata authentication successful")
                 
                 # Test a simple search
-                results = earthaccess.search_data(
+                results = await asyncio.to_thread(
+                    earthaccess.search_data,
                     short_name="MOD11A1",
                     version="6",
                     temporal=("2024-01-01", "2024-01-02"),
@@ -183,8 +313,8 @@ class RealDataSetup:
             logger.error(f"❌ NASA connection test failed: {e}")
             return False
     
-    async def test_supabase_connection(self):
-        """Test Supabase connection."""
+    async def test_supabase_connection(self, env: Optional[Dict[str, str]] = None):
+        """Test Supabase connection, using env instead of .env when given."""
         if not self.has_supabase:
             logger.info("🗄️  Skipping Supabase connection test (no credentials)")
             return True
@@ -194,13 +324,8 @@ class RealDataSetup:
         try:
             from supabase import create_client
             
-            # Read credentials from .env
-            env_vars = {}
-            with open(self.env_file, 'r') as f:
-                for line in f:
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.strip().split('=', 1)
-                        env_vars[key] = value
+            # Read credentials from .env unless they were passed in
+            env_vars = env if env is not None else self._load_env()
             
             url = env_vars.get('SUPABASE_URL')
             key = env_vars.get('SUPABASE_ANON_KEY')
@@ -210,7 +335,7 @@ class RealDataSetup:
             
             # Try a simple query (this might fail if tables don't exist, but connection will work)
             try:
-                result = supabase.table('test').select("*").limit(1).execute()
+                result = await asyncio.to_thread(supabase.table('test').select("*").limit(1).execute)
                 logger.info("✅ Supabase connection successful")
             except Exception:
                 logger.info("✅ Supabase connection successful (no tables yet)")
@@ -247,99 +372,17 @@ class RealDataSetup:
     
     def create_supabase_setup_guide(self):
         """Create a guide for setting up Supabase."""
-        guide_content = """# Supabase Setup Guide for Urban Resilience Dashboard
-
-## Step 1: Create Supabase Project
-
-1. Go to https://supabase.com
-2. Sign up/Login to your account
-3. Click "New Project"
-4. Choose organization and enter project details:
-   - Name: `urban-resilience-mumbai`
-   - Database Password: (choose a strong password)
-   - Region: Choose closest to your location
-
-## Step 2: Get Project Credentials
-
-1. Go to Project Settings > API
-2. Copy the following values:
-   - Project URL: `https://your-project-id.supabase.co`
-   - Anon/Public Key: `eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...`
-   - Service Role Key: `eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...`
-
-## Step 3: Update .env File
-
-Replace these values in your `.env` file:
-```
-SUPABASE_URL=https://your-actual-project-id.supabase.co
-SUPABASE_ANON_KEY=your_actual_anon_key
-SUPABASE_SERVICE_KEY=your_actual_service_role_key
-```
-
-## Step 4: Enable PostGIS (Optional)
-
-1. Go to Database > Extensions
-2. Search for "postgis"
-3. Enable the PostGIS extension
-
-## Step 5: Test Connection
-
-Run: `python setup_real_data.py test`
-
-Your Supabase database is now ready for the Urban Resilience Dashboard!
-"""
-        
-        with open("SUPABASE_SETUP.md", 'w') as f:
-            f.write(guide_content)
-        
-        logger.info("📝 Created SUPABASE_SETUP.md guide")
+        if _write_if_changed(Path("SUPABASE_SETUP.md"), SUPABASE_SETUP_GUIDE):
+            logger.info("📝 Created SUPABASE_SETUP.md guide")
+        else:
+            logger.info("📝 SUPABASE_SETUP.md guide already up to date")
     
     def create_nasa_setup_guide(self):
         """Create a guide for setting up NASA Earthdata credentials."""
-        guide_content = """# NASA Earthdata Setup Guide
-
-## Step 1: Create NASA Earthdata Account
-
-1. Go to https://urs.earthdata.nasa.gov/
-2. Click "Register for a profile"
-3. Fill out the registration form
-4. Verify your email address
-5. Complete your profile
-
-## Step 2: Get Your Credentials
-
-1. Login to NASA Earthdata
-2. Your username and password are your login credentials
-3. No additional API keys needed
-
-## Step 3: Update .env File
-
-Replace these values in your `.env` file:
-```
-NASA_EARTHDATA_USERNAME=your_actual_nasa_username
-NASA_EARTHDATA_PASSWORD=your_actual_nasa_password
-```
-
-## Step 4: Test Connection
-
-Run: `python setup_real_data.py test`
-
-## Available NASA Datasets
-
-With your credentials, you can access:
-- MODIS Land Surface Temperature (MOD11A1)
-- Aura OMI Air Quality (OMI NO2, SO2)
-- GPM Precipitation (IMERG)
-- Landsat NDVI and vegetation indices
-- VIIRS Night Lights
-
-Your NASA Earthdata access is now ready!
-"""
-        
-        with open("NASA_SETUP.md", 'w') as f:
-            f.write(guide_content)
-        
-        logger.info("📝 Created NASA_SETUP.md guide")
+        if _write_if_changed(Path("NASA_SETUP.md"), NASA_SETUP_GUIDE):
+            logger.info("📝 Created NASA_SETUP.md guide")
+        else:
+            logger.info("📝 NASA_SETUP.md guide already up to date")
     
     async def run_full_setup(self):
         """Run complete setup process."""
@@ -351,16 +394,19 @@ Your NASA Earthdata access is now ready!
             return False
         
         # Step 2: Install dependencies
-        if not self.install_dependencies():
+        if not await self.install_dependencies():
             return False
         
         # Step 3: Setup directories
         if not self.setup_data_directories():
             return False
         
-        # Step 4: Test connections
-        nasa_ok = await self.test_nasa_connection()
-        supabase_ok = await self.test_supabase_connection()
+        # Step 4: Test connections (independent, so run them concurrently)
+        env = self._load_env()
+        nasa_ok, supabase_ok = await asyncio.gather(
+            self.test_nasa_connection(env),
+            self.test_supabase_connection(env)
+        )
         
         # Step 5: Run system test
         system_ok = await self.run_system_test()
@@ -403,11 +449,11 @@ async def main():
     setup = RealDataSetup()
     
     if args.action == "install":
-        setup.install_dependencies()
+        await setup.install_dependencies()
     elif args.action == "test":
-        setup.check_environment()
-        await setup.test_nasa_connection()
-        await setup.test_supabase_connection()
+        if setup.check_environment():
+            env = setup._load_env()
+            await asyncio.gather(setup.test_nasa_connection(env), setup.test_supabase_connection(env))
         await setup.run_system_test()
     else:
         await setup.run_full_setup()
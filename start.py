@@ -5,14 +5,12 @@ import sys
 import os
 from pathlib import Path
 import logging
-import uvicorn
 from datetime import datetime
 
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent))
 
 from config import settings
-from scripts.run_analysis import run_full_analysis
 
 # Configure logging
 logging.basicConfig(
@@ -59,6 +57,7 @@ async def initialize_system():
         # Check if we should run initial analysis
         if os.getenv("RUN_INITIAL_ANALYSIS", "false").lower() == "true":
             logger.info("🔍 Running initial analysis...")
+            from scripts.run_analysis import run_full_analysis
             await run_full_analysis()
             logger.info("✅ Initial analysis completed")
         
@@ -72,15 +71,28 @@ async def initialize_system():
 def start_api_server():
     """Start the FastAPI server."""
     logger.info("🚀 Starting FastAPI server...")
+    import uvicorn
     
-    uvicorn.run(
-        "main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=settings.debug,
-        log_level="info" if settings.debug else "warning",
-        access_log=settings.debug
-    )
+    if settings.debug:
+        # Reload needs an import string so the reloader can re-import the app
+        uvicorn.run(
+            "main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            reload=True,
+            log_level="info",
+            access_log=True
+        )
+    else:
+        from main import app
+        
+        uvicorn.run(
+            app,
+            host=settings.api_host,
+            port=settings.api_port,
+            log_level="warning",
+            access_log=False
+        )
 
 
 async def main():
@@ -109,6 +121,7 @@ if __name__ == "__main__":
         if command == "analysis":
             # Run analysis only
             print("🔍 Running Urban Resilience Analysis...")
+            from scripts.run_analysis import run_full_analysis
             asyncio.run(run_full_analysis())
         elif command == "worker":
             # Start background worker